@@ -0,0 +1,64 @@
+#!/usr/bin/python3 -tt
+"""
+Startup benchmark for cronbackoff
+
+Times complete cronbackoff runs (wrapping /bin/true) as a plain script, as a
+script with -I -S, and as the zipapp from build_zipapp.py.
+
+Run directly, e.g.: ./bench_startup.py --runs 200
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import build_zipapp
+
+
+def main():
+    opts = _parseArgs(sys.argv)
+    workDir = tempfile.mkdtemp(prefix="bench_startup-")
+    try:
+        pyz = os.path.join(workDir, "cronbackoff.pyz")
+        build_zipapp.build(pyz, "%s -IS" % sys.executable)
+        variants = [
+            ("script", [sys.executable, build_zipapp.SOURCE]),
+            ("script -IS", [sys.executable, "-IS", build_zipapp.SOURCE]),
+            ("zipapp -IS", [pyz]),
+        ]
+        stateDir = os.path.join(workDir, "state")
+        times = _bench([command for _, command in variants], stateDir, opts.runs)
+        print("%d runs each, wrapping /bin/true" % opts.runs)
+        baseline = None
+        for (label, _), median in zip(variants, times):
+            if baseline is None:
+                baseline = median
+            print("  %-12s median %6.2f ms (%.2fx)" % (label, median * 1000, baseline / median))
+    finally:
+        shutil.rmtree(workDir)
+
+
+def _parseArgs(args):
+    parser = argparse.ArgumentParser(prog=os.path.basename(args[0]))
+    parser.add_argument("-r", "--runs", default=100, type=int,
+                        help="Runs per variant (Default: %(default)s)")
+    return parser.parse_args(args=args[1:])
+
+
+def _bench(commands, stateDir, runs):
+    # Interleave the variants, so that system noise affects them all equally.
+    times = [[] for _ in commands]
+    for _ in range(runs):
+        for command, results in zip(commands, times):
+            start = time.perf_counter()
+            subprocess.check_call(command + ["--state-dir", stateDir, "--", "/bin/true"])
+            results.append(time.perf_counter() - start)
+    return [sorted(results)[runs // 2] for results in times]
+
+
+if __name__ == '__main__':
+    main()
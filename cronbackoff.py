@@ -21,7 +21,8 @@ def main():
         state = State(opts.state_dir, opts.name)
         delay = state.setup()
         if not delay:
-            success = execute(opts.command)
+            success = execute(opts.command, passthrough=opts.passthrough,
+                              outputPath=opts.output)
             state.save(success, opts.base_delay, opts.max_delay, opts.exponent)
     except CronBackoffException as e:
         if e.status == 0:
@@ -42,7 +43,7 @@ def main():
         sys.exit(1)
     finally:
         # If there wasn't an existing state file, and it hasn't been closed already,
-        # that means we've created an empty one, so unlink it.
+        # that means we've created a placeholder one, so unlink it.
         if state and not state.stateExists and state.file:
             os.unlink(state.filePath)
             state.file.close()
@@ -83,6 +84,12 @@ def _parseArgs(args):
                         default=os.path.join(
                             tempfile.gettempdir(), "%s-%s" % (bareProg, user)),
                         help="Directory to store state in (Default: %(default)s)")
+    parser.add_argument("-p", "--passthrough", action='store_true',
+                        help=("Don't capture command output, let the command inherit"
+                              " stdout/stderr instead"))
+    parser.add_argument("-o", "--output", default=None,
+                        help=("File to append command output to (e.g. /dev/null)."
+                              " Implies --passthrough"))
     parser.add_argument("command", nargs="+",
                         help="Command to run")
     opts = parser.parse_args(args=args[1:])
@@ -90,6 +97,9 @@ def _parseArgs(args):
     if opts.name is None:
         opts.name = os.path.basename(opts.command[0])
     opts.state_dir = os.path.expanduser(opts.state_dir)
+    if opts.output is not None:
+        opts.output = os.path.expanduser(opts.output)
+        opts.passthrough = True
 
     logger = _getLogger()
     logger.name = prog
@@ -121,9 +131,11 @@ def _formatTime(seconds, precision="seconds"):
     return " ".join(out)
 
 
-def execute(command):
+def execute(command, passthrough=False, outputPath=None):
     logging.info("About to execute command: %s", " ".join(command))
     logging.debug("Raw command: %r", command)
+    if passthrough or outputPath is not None:
+        return _executePassthrough(command, outputPath)
     success = True
     try:
         output = subprocess.check_output(command, stderr=subprocess.STDOUT)
@@ -146,6 +158,35 @@ def execute(command):
     return success
 
 
+def _executePassthrough(command, outputPath):
+    output = None
+    if outputPath is not None:
+        logging.debug("Sending command output to %s", outputPath)
+        try:
+            output = open(outputPath, 'ab')
+        except IOError as e:
+            raise CronBackoffException(
+                "Unable to open output file (%s): %s" % (outputPath, e), excep=e)
+    else:
+        logging.debug("Command output not captured")
+
+    try:
+        status = subprocess.call(command, stdout=output, stderr=output)
+    except OSError as e:
+        raise CronBackoffException(
+            "Error running command %r: %s" % (command, e),
+            excep=e)
+    finally:
+        if output is not None:
+            output.close()
+
+    if status != 0:
+        logging.warning("Command %r returned non-zero exit status %d", command, status)
+        return False
+    logging.info("Command exited cleanly")
+    return True
+
+
 class State(object):
     def __init__(self, dir_, name):
         self.dir = dir_
@@ -212,19 +253,58 @@ class State(object):
 
         if not self.stateExists:
             logging.debug("Creating new state file")
+            self._create()
+        else:
+            logging.debug("Locking state file")
+            self._flock()
+            self._checkLinked()
+        logging.debug("State file opened & locked")
+
+    def _create(self):
+        try:
+            fd, tmpPath = tempfile.mkstemp(dir=self.dir, prefix=".%s." % self.name)
+        except OSError as e:
+            raise CronBackoffException(
+                "Unable to create state file: %s" % e, excep=e)
+        self.file = os.fdopen(fd, 'w+')
+        # Lock and populate the new file before linking it into place, so a
+        # concurrent run can never find it unlocked or empty.
+        try:
+            self._flock()
             try:
-                self.file = open(self.filePath, 'w+')
-            except IOError as e:
+                self.file.write("0\n")
+                self.file.flush()
+                os.link(tmpPath, self.filePath)
+            except (IOError, OSError) as e:
                 raise CronBackoffException(
                     "Unable to create state file: %s" % e, excep=e)
+        except CronBackoffException:
+            self.file.close()
+            self.file = None
+            raise
+        finally:
+            os.unlink(tmpPath)
 
-        logging.debug("Locking state file")
+    def _flock(self):
         try:
             fcntl.flock(self.file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
         except IOError as e:
             raise CronBackoffException(
                 "Unable to lock state file (%s): %s" % (self.filePath, e), excep=e)
-        logging.debug("State file opened & locked")
+
+    def _checkLinked(self):
+        # Another run may have unlinked the file between us opening and locking it.
+        fst = os.fstat(self.file.fileno())
+        try:
+            st = os.stat(self.filePath)
+        except OSError as e:
+            if e.errno != errno.ENOENT:
+                raise CronBackoffException(
+                    "Unable to stat state file: %s" % e, excep=e)
+            st = None
+        if st is None or (st.st_dev, st.st_ino) != (fst.st_dev, fst.st_ino):
+            raise CronBackoffException(
+                "State file (%s) was removed while locking it" % self.filePath)
 
     def _read(self):
         if not self.stateExists:
@@ -287,11 +367,15 @@ class State(object):
             else:
                 nextDelay = min(self.lastDelay * exponent, max_delay)
 
+        contents = "%d\n" % nextDelay
         try:
+            # Overwrite the old contents with whitespace padding and only then
+            # truncate, so the file holds a valid integer wherever we get killed.
+            oldSize = os.fstat(self.file.fileno()).st_size
             self.file.seek(0)
-            self.file.truncate(0)
-            self.file.write("%d\n" % nextDelay)
+            self.file.write(contents.ljust(oldSize))
             self.file.flush()
+            self.file.truncate(len(contents))
             self.file.close()
             self.file = None
         except IOError as e:
@@ -306,6 +390,7 @@ class State(object):
 
 class CronBackoffException(Exception):
     def __init__(self, message, excep=None, status=1):
+        self.message = message
         self.excep = excep
         self.errno = None
         self.status = status
@@ -0,0 +1,278 @@
+#!/usr/bin/python3 -tt
+"""
+Stress/contention harness for cronbackoff.py
+
+Runs many concurrent cronbackoff invocations against shared and separate state
+files, reporting lock acquisition latency and throughput, and SIGKILLs runs
+(both at random times, and at every line of State.save()) to check that state
+files are never left corrupt or empty.
+
+Run directly, e.g.: ./stress_cronbackoff.py --procs 200 --iterations 5
+"""
+
+import argparse
+import errno
+import logging
+import multiprocessing
+import os
+import random
+import shutil
+import signal
+import sys
+import tempfile
+import time
+
+import cronbackoff
+
+# Upper bound on line events in State.save(), to stop the kill sweep running away.
+MAX_SAVE_LINES = 100
+
+
+def main():
+    opts = _parseArgs(sys.argv)
+    stateDir = opts.state_dir or tempfile.mkdtemp(prefix="stress_cronbackoff-")
+    failed = False
+    try:
+        for label, jobs in [("same job", 1), ("different jobs", opts.procs)]:
+            subDir = os.path.join(stateDir, label.replace(" ", "-"))
+            failed |= _runContention(label, subDir, opts.procs, opts.iterations, jobs)
+        failed |= _runRandomKills(os.path.join(stateDir, "random-kills"), opts.procs)
+        failed |= _runSaveKills(os.path.join(stateDir, "save-kills"))
+    finally:
+        if not opts.state_dir:
+            shutil.rmtree(stateDir)
+    if failed:
+        print("FAILED")
+        sys.exit(1)
+    print("OK")
+
+
+def _parseArgs(args):
+    parser = argparse.ArgumentParser(prog=os.path.basename(args[0]))
+    parser.add_argument("-p", "--procs", default=200, type=int,
+                        help="Number of concurrent processes (Default: %(default)s)")
+    parser.add_argument("-i", "--iterations", default=5, type=int,
+                        help="Invocations per process (Default: %(default)s)")
+    parser.add_argument("--state-dir", default=None,
+                        help="Directory to keep state in (Default: a temporary dir)")
+    return parser.parse_args(args=args[1:])
+
+
+def _runContention(label, stateDir, procs, iterations, jobs):
+    names = ["job%d" % i for i in range(jobs)]
+    queue = multiprocessing.Queue()
+    barrier = multiprocessing.Barrier(procs)
+    workers = [
+        multiprocessing.Process(
+            target=_contentionWorker,
+            args=(barrier, queue, stateDir, names, iterations, seed))
+        for seed in range(procs)]
+    start = time.time()
+    for w in workers:
+        w.start()
+    results = []
+    for _ in workers:
+        results.extend(queue.get())
+    for w in workers:
+        w.join()
+    elapsed = time.time() - start
+
+    outcomes = {}
+    for _, outcome in results:
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+    latencies = sorted(latency for latency, _ in results if latency is not None)
+    print("== Contention: %s (%d procs x %d iterations, %d state files)" %
+          (label, procs, iterations, jobs))
+    print("   %d invocations in %.2fs (%.0f/s)" %
+          (len(results), elapsed, len(results) / elapsed))
+    print("   outcomes: %s" % ", ".join(
+        "%s=%d" % item for item in sorted(outcomes.items())))
+    if latencies:
+        print("   lock latency (ms): p50=%.3f p95=%.3f p99=%.3f max=%.3f" % tuple(
+            1000 * _percentile(latencies, p) for p in (50, 95, 99, 100)))
+
+    bad = _checkStateDir(stateDir, allowStray=False)
+    for outcome in ("corrupt", "error", "crashed"):
+        if outcomes.get(outcome):
+            bad.append("%d invocations had outcome %r" % (outcomes[outcome], outcome))
+    return _report(bad)
+
+
+def _contentionWorker(barrier, queue, stateDir, names, iterations, seed):
+    rng = random.Random(seed)
+    record = _instrument()
+    barrier.wait()
+    results = []
+    try:
+        for _ in range(iterations):
+            command = rng.choice(["/bin/true", "/bin/false"])
+            record.clear()
+            status = _invoke(stateDir, names[seed % len(names)], command)
+            results.append((record.get("latency"), _outcome(record, status)))
+    except BaseException:
+        results.append((None, "crashed"))
+        raise
+    finally:
+        queue.put(results)
+
+
+def _runRandomKills(stateDir, procs):
+    names = ["job%d" % i for i in range(max(procs // 10, 1))]
+    rng = random.Random(0)
+    workers = []
+    for seed in range(procs):
+        w = multiprocessing.Process(
+            target=_killWorker, args=(stateDir, rng.choice(names), seed))
+        w.start()
+        workers.append(w)
+    for w in rng.sample(workers, len(workers) // 2):
+        time.sleep(rng.uniform(0, 0.01))
+        w.kill()
+    for w in workers:
+        w.join()
+
+    print("== Random SIGKILLs (%d procs, %d state files)" % (procs, len(names)))
+    return _report(_checkStateDir(stateDir, allowStray=True))
+
+
+def _killWorker(stateDir, name, seed):
+    rng = random.Random(seed)
+    _instrument()
+    _invoke(stateDir, name, ["sleep", "%.3f" % rng.uniform(0, 0.02)])
+
+
+def _runSaveKills(stateDir):
+    name = "job"
+    filePath = os.path.join(stateDir, name)
+    os.mkdir(stateDir, 0o700)
+    bad = []
+    kills = 0
+    for success in (True, False):
+        for line in range(1, MAX_SAVE_LINES):
+            # Start out of backoff, with contents longer than what save() will
+            # write, so that any partial write would show.
+            with open(filePath, 'w') as f:
+                f.write("1440\n")
+            os.utime(filePath, (0, 0))
+            command = "/bin/true" if success else "/bin/false"
+            w = multiprocessing.Process(
+                target=_saveKillWorker, args=(stateDir, name, command, line))
+            w.start()
+            w.join()
+            if w.exitcode != -signal.SIGKILL:
+                break
+            kills += 1
+            for err in _checkStateDir(stateDir, allowStray=False):
+                bad.append("killed at line %d of save(): %s" % (line, err))
+
+    print("== SIGKILL at each line of State.save() (%d kills)" % kills)
+    return _report(bad)
+
+
+def _saveKillWorker(stateDir, name, command, killLine):
+    saveCode = cronbackoff.State.save.__code__
+    lines = [0]
+
+    def localTrace(frame, event, arg):
+        if event == 'line':
+            lines[0] += 1
+            if lines[0] == killLine:
+                os.kill(os.getpid(), signal.SIGKILL)
+        return localTrace
+
+    def globalTrace(frame, event, arg):
+        if frame.f_code is saveCode:
+            return localTrace
+        return None
+
+    _instrument()
+    sys.settrace(globalTrace)
+    _invoke(stateDir, name, command)
+
+
+def _instrument():
+    """
+    Silence cronbackoff's logging, and wrap State methods to record lock latency
+    and failures. Returns the dict that records are written into.
+    """
+    logging.disable(logging.CRITICAL)
+    record = {}
+    origLock = cronbackoff.State._lock
+    origRead = cronbackoff.State._read
+
+    def lock(self):
+        start = time.time()
+        try:
+            origLock(self)
+        except cronbackoff.CronBackoffException as e:
+            record["lockError"] = e
+            raise
+        finally:
+            record["latency"] = time.time() - start
+
+    def read(self):
+        try:
+            origRead(self)
+        except cronbackoff.CronBackoffException as e:
+            record["readError"] = e
+            raise
+
+    cronbackoff.State._lock = lock
+    cronbackoff.State._read = read
+    return record
+
+
+def _invoke(stateDir, name, command):
+    if not isinstance(command, list):
+        command = [command]
+    sys.argv = ["cronbackoff", "-b", "0", "-m", "0",
+                "--state-dir", stateDir, "-n", name, "--"] + command
+    try:
+        cronbackoff.main()
+    except SystemExit as e:
+        return e.code
+    return 0
+
+
+def _outcome(record, status):
+    if "readError" in record:
+        return "corrupt"
+    if "lockError" in record:
+        # Losing the race for the lock (or for creating/keeping the state file)
+        # is expected, anything else isn't.
+        if record["lockError"].errno in (None, errno.EAGAIN, errno.EEXIST):
+            return "contended"
+        return "error"
+    return "ran" if status == 0 else "error"
+
+
+def _checkStateDir(stateDir, allowStray):
+    bad = []
+    for entry in sorted(os.listdir(stateDir)):
+        path = os.path.join(stateDir, entry)
+        if entry.startswith("."):
+            # Temporary file from a run killed while creating new state.
+            if not allowStray:
+                bad.append("stray temporary file %s" % path)
+            continue
+        with open(path) as f:
+            contents = f.read()
+        try:
+            int(contents)
+        except ValueError:
+            bad.append("corrupt state file %s: %r" % (path, contents))
+    return bad
+
+
+def _percentile(values, p):
+    return values[min(int(len(values) * p / 100), len(values) - 1)]
+
+
+def _report(bad):
+    for err in bad:
+        print("   ERROR: %s" % err)
+    return bool(bad)
+
+
+if __name__ == '__main__':
+    main()
@@ -55,8 +55,18 @@ class TestParseArgs(unittest.TestCase):
         self.assertAlmostEqual(opts.exponent, 4)
         self.assertEqual(opts.debug, False)
         self.assertEqual(opts.name, name)
+        self.assertEqual(opts.passthrough, False)
+        self.assertIsNone(opts.output)
         self.assertEqual(opts.command, [command])
 
+    def test_output_implies_passthrough(self):
+        prog = "nosetests"
+        opts = cronbackoff._parseArgs(
+            [prog, "--output", "/dev/null", "--", "/bin/true"])
+
+        self.assertEqual(opts.passthrough, True)
+        self.assertEqual(opts.output, "/dev/null")
+
 
 class TestFormatTime(unittest.TestCase):
     def test_zero(self):
@@ -139,6 +149,47 @@ class TestExecute(unittest.TestCase):
         self.assertEqual(ctx.exception.errno, errno.EACCES)
         os.unlink(testScript)
 
+    def test_passthrough_success(self):
+        testScript = os.path.join(self.tempDir, "test")
+        with open(testScript, "w") as f:
+            f.write("#!/bin/bash\n\nexit 0")
+            os.fchmod(f.fileno(), 0o700)
+        self.assertTrue(cronbackoff.execute([testScript], passthrough=True))
+        os.unlink(testScript)
+
+    def test_passthrough_failure(self):
+        testScript = os.path.join(self.tempDir, "test")
+        with open(testScript, "w") as f:
+            f.write("#!/bin/bash\n\nexit 1")
+            os.fchmod(f.fileno(), 0o700)
+        self.assertFalse(cronbackoff.execute([testScript], passthrough=True))
+        os.unlink(testScript)
+
+    def test_passthrough_output(self):
+        testScript = os.path.join(self.tempDir, "test")
+        outputPath = os.path.join(self.tempDir, "output")
+        with open(testScript, "w") as f:
+            f.write("#!/bin/bash\n\necho TESTING\necho ERR >&2\nexit 0")
+            os.fchmod(f.fileno(), 0o700)
+        self.assertTrue(cronbackoff.execute([testScript], outputPath=outputPath))
+        self.assertTrue(cronbackoff.execute([testScript], outputPath=outputPath))
+        with open(outputPath) as f:
+            self.assertEqual(f.read(), "TESTING\nERR\n" * 2)
+        os.unlink(outputPath)
+        os.unlink(testScript)
+
+    def test_passthrough_not_found(self):
+        testScript = os.path.join(self.tempDir, "test")
+        with self.assertRaises(cronbackoff.CronBackoffException) as ctx:
+            cronbackoff.execute([testScript], passthrough=True)
+        self.assertEqual(ctx.exception.errno, errno.ENOENT)
+
+    def test_passthrough_bad_output(self):
+        outputPath = os.path.join(self.tempDir, "noexisty", "output")
+        with self.assertRaises(cronbackoff.CronBackoffException) as ctx:
+            cronbackoff.execute(["/bin/true"], outputPath=outputPath)
+        self.assertEqual(ctx.exception.errno, errno.ENOENT)
+
 
 class StateWrapper(unittest.TestCase):
     def setUp(self):
@@ -212,6 +263,35 @@ class TestStateLock(StateWrapper):
         self.state.file.close()
         os.unlink(self.state.filePath)
 
+    def test_no_state_placeholder(self):
+        self.state._lock()
+        with open(self.state.filePath) as f:
+            self.assertEqual(f.read(), "0\n")
+        # No temporary files left behind.
+        self.assertEqual(os.listdir(self.tempDir), [self.name])
+        self.state.file.close()
+        os.unlink(self.state.filePath)
+
+    def test_no_state_created_concurrently(self):
+        self.state._lock()
+        newstate = cronbackoff.State(self.tempDir, self.name)
+        newstate.stateExists = False
+        with self.assertRaises(cronbackoff.CronBackoffException) as ctx:
+            newstate._create()
+        self.assertEqual(ctx.exception.errno, errno.EEXIST)
+        self.assertIsNone(newstate.file)
+        self.assertEqual(os.listdir(self.tempDir), [self.name])
+        self.state.file.close()
+        os.unlink(self.state.filePath)
+
+    def test_removed_while_locking(self):
+        self.state._lock()
+        os.unlink(self.state.filePath)
+        with self.assertRaises(cronbackoff.CronBackoffException) as ctx:
+            self.state._checkLinked()
+        self.assertTrue("removed while locking" in str(ctx.exception))
+        self.state.file.close()
+
     def test_no_state_dir(self):
         self.state.dir = os.path.join(self.tempDir, "noexisty")
         self.state.filePath = os.path.join(self.state.dir, self.state.name)
@@ -385,6 +465,10 @@ class TestStateSave(StateWrapper):
         self.state.lastDelay = 33
         self._basic_test("263\n", (False, 12, 263, 10))
 
+    def test_shorter_contents(self):
+        self.state.file.write("1440\n")
+        self._basic_test("0\n", (True, 1, 1, 1))
+
     def test_write_error(self):
         self.state.file.close()
         with open(self.state.filePath, 'r') as self.state.file: